@@ -0,0 +1,8 @@
+"""
+RAG experiment scripts and utilities
+
+Run scripts as modules from the repo root so package imports resolve
+without sys.path hacks, e.g.:
+
+    python -m experiments.add_entities
+"""
@@ -0,0 +1,36 @@
+"""
+Driver that runs the experiment scripts in one interpreter
+
+A single process keeps the shared state warm across scripts — the
+Supabase/OpenAI clients from config, the cached world ID, and the
+embedding/semantic caches — instead of paying cold imports and fresh
+connections per script.
+
+Usage, from the repo root:
+
+    python -m experiments                     # run the default set
+    python -m experiments test_latency ...    # run specific scripts
+"""
+
+import importlib
+import sys
+
+DEFAULT_SCRIPTS = ('inspect_prompts', 'test_latency', 'regenerate_threshold_plot')
+
+
+def main(script_names):
+    # Scripts that parse arguments (regenerate_threshold_plot) must not
+    # see the driver's script-name arguments
+    sys.argv = sys.argv[:1]
+    for name in script_names:
+        print()
+        print("#" * 80)
+        print(f"# Running {name}")
+        print("#" * 80)
+        # The scripts run at import time; importing them here executes
+        # each one inside this interpreter
+        importlib.import_module(f'.{name}', package=__package__)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_SCRIPTS)
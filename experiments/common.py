@@ -0,0 +1,262 @@
+"""
+Shared ingestion helpers for the experiment scripts
+
+Houses the Supabase/OpenAI clients, batched embedding generation and the
+bulk-insert paths so every script drives the same optimized machinery
+instead of carrying its own copy.
+"""
+
+import asyncio
+import functools
+import json
+import random
+import time
+
+import numpy as np
+from openai import AsyncOpenAI, RateLimitError
+from tqdm import tqdm
+
+from .config import (
+    SUPABASE_DB_URL, OPENAI_API_KEY,
+    supabase, openai_client, get_world_id
+)
+
+def _retry_on_rate_limit(func):
+    """Retry with exponential backoff + jitter when OpenAI rate limits
+
+    Reactive throttling: normal calls pay nothing, and actual 429s back
+    off instead of the old preemptive 200ms sleep per row.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        delay = 1.0
+        for attempt in range(6):
+            try:
+                return func(*args, **kwargs)
+            except RateLimitError:
+                if attempt == 5:
+                    raise
+                time.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, 16.0)
+    return wrapper
+
+@_retry_on_rate_limit
+def _generate_embedding_uncached(text):
+    response = openai_client.embeddings.create(
+        model="text-embedding-ada-002",
+        input=text
+    )
+    return response.data[0].embedding
+
+@functools.lru_cache(maxsize=4096)
+def _embed_cached(text):
+    """Memoized embedding, stored as a tuple so callers can't mutate it"""
+    return tuple(_generate_embedding_uncached(text))
+
+def generate_embedding(text):
+    """Generate embedding for text
+
+    Memoized per process: the same name/description string embedded
+    again (e.g. during dev re-runs) skips the API call.
+    """
+    return list(_embed_cached(text))
+
+# Provider limits for text-embedding-ada-002 batch requests: at most 2048
+# inputs per request, and keep each request well below the TPM ceiling
+_EMBED_MAX_INPUTS = 2048
+_EMBED_MAX_TOKENS = 200_000
+
+@functools.lru_cache(maxsize=1)
+def _embedding_encoder():
+    import tiktoken
+    return tiktoken.encoding_for_model("text-embedding-ada-002")
+
+def _pack_by_tokens(texts):
+    """Greedy-pack texts into request chunks that respect provider limits
+
+    Maximizes batch size without risking a 400 (or silent truncation)
+    once entity descriptions grow past what a fixed row count assumes.
+    """
+    enc = _embedding_encoder()
+    token_counts = [len(t) for t in enc.encode_batch(texts)]
+
+    chunks = []
+    current, current_tokens = [], 0
+    for text, n_tokens in zip(texts, token_counts):
+        if current and (len(current) >= _EMBED_MAX_INPUTS
+                        or current_tokens + n_tokens > _EMBED_MAX_TOKENS):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += n_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+@_retry_on_rate_limit
+def _embed_request(texts):
+    """One embeddings API request, returning float32 numpy vectors"""
+    response = openai_client.embeddings.create(
+        model="text-embedding-ada-002",
+        input=texts
+    )
+    return [np.asarray(d.embedding, dtype=np.float32) for d in response.data]
+
+def generate_embeddings_batch(texts, desc="Embedding"):
+    """Generate embeddings for a list of texts in batched API calls
+
+    Duplicate texts are embedded once and fanned back out to every
+    position they appear in, so repeated strings cost nothing extra.
+    Progress is a single updatable tqdm bar over the request chunks
+    rather than one print per row. Vectors come back as float32 numpy
+    arrays and stay that way until the insert encodes them.
+    """
+    unique = list(dict.fromkeys(texts))
+    vectors = []
+    for chunk in tqdm(_pack_by_tokens(unique), desc=desc, unit="batch"):
+        vectors.extend(_embed_request(chunk))
+    lookup = dict(zip(unique, vectors))
+    return [lookup[t] for t in texts]
+
+async def _embed_async(client, text, sem):
+    """Embed one text under the shared concurrency limit, with backoff on rate limits"""
+    delay = 1.0
+    async with sem:
+        for attempt in range(6):
+            try:
+                response = await client.embeddings.create(
+                    model="text-embedding-ada-002",
+                    input=text
+                )
+                return response.data[0].embedding
+            except RateLimitError:
+                if attempt == 5:
+                    raise
+                await asyncio.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, 16.0)
+
+def generate_embeddings_concurrent(texts, max_concurrent=16):
+    """Embed texts with one request each, overlapped via asyncio
+
+    Fallback for when the single batched request is not usable (e.g.
+    per-row retry or logging is needed). Concurrency replaces the old
+    serial loop with fixed sleeps.
+    """
+    async def _gather():
+        client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        sem = asyncio.Semaphore(max_concurrent)
+        try:
+            return await asyncio.gather(*(_embed_async(client, t, sem) for t in texts))
+        finally:
+            await client.close()
+
+    return asyncio.run(_gather())
+
+# Direct COPY kicks in above this row count (when SUPABASE_DB_URL is set)
+COPY_THRESHOLD = 100
+
+def _pg_literal(value):
+    """Render a value for COPY text format (pgvector expects '[f1,f2,...]')"""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, list):
+        return "[" + ",".join(map(repr, value)) + "]"
+    return value
+
+def bulk_copy(table, rows, columns):
+    """Load rows over a direct Postgres connection with COPY ... FROM STDIN
+
+    Bypasses PostgREST and its JSON encoding of the 1536-float embedding
+    column, which dominates payload size on large imports.
+    """
+    import psycopg
+
+    with psycopg.connect(SUPABASE_DB_URL) as conn:
+        with conn.cursor() as cur:
+            with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row([_pg_literal(row[col]) for col in columns])
+
+def bulk_insert(table, rows, chunk_size=500):
+    """Insert rows with one request per chunk instead of one per row"""
+    if SUPABASE_DB_URL and len(rows) >= COPY_THRESHOLD:
+        bulk_copy(table, rows, list(rows[0].keys()))
+        return
+
+    for start in range(0, len(rows), chunk_size):
+        # JSON-encode numpy vectors only at the last moment
+        chunk = [
+            {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in row.items()}
+            for row in rows[start:start + chunk_size]
+        ]
+        supabase.table(table).insert(chunk).execute()
+
+# Rows per embed-then-insert pipeline stage; caps peak memory at one chunk
+PIPELINE_CHUNK_SIZE = 128
+
+def add_entities(table, rows, extra_cols=(), chunk_size=PIPELINE_CHUNK_SIZE):
+    """Embed and bulk-insert a list of entities into a table
+
+    Rows flow through a two-stage pipeline: embed one chunk, insert it,
+    drop the references. Peak memory stays at one chunk of vectors
+    instead of the whole payload (~6KB per row), which matters when this
+    script pattern is reused for imports far beyond the seed data.
+
+    extra_cols entries are either a row key or a (row_key, column) pair
+    for when the data key differs from the database column (e.g. the
+    rules data uses "is_high_priority" but the column is "priority").
+    """
+    world_id = get_world_id()
+    print(f"Adding {len(rows)} {table}...")
+
+    for start in range(0, len(rows), chunk_size):
+        group = rows[start:start + chunk_size]
+        texts = [f"{row['name']} {row['description']}" for row in group]
+        embeddings = generate_embeddings_batch(texts, desc=f"Embedding {table}")
+
+        payload = []
+        for row, embedding in zip(group, embeddings):
+            data = {
+                "world_id": world_id,
+                "name": row["name"],
+                "description": row["description"],
+                "embedding": embedding
+            }
+            for col in extra_cols:
+                key, column = (col, col) if isinstance(col, str) else col
+                data[column] = row[key]
+            payload.append(data)
+
+        bulk_insert(table, payload)
+
+    print(f"[OK] Added {len(rows)} {table}\n")
+
+def add_entities_via_edge_function(table, rows, extra_cols=()):
+    """Ingest rows server-side through the ingest_entities Edge Function
+
+    The client uploads only the text rows in one batched POST; the
+    function embeds them from Supabase's own egress and inserts the
+    vectors directly, so the 1536-float payloads (~20KB/row as JSON)
+    never transit the client at all. The function source lives in
+    supabase/functions/ingest_entities and must be deployed to the
+    project (see USE_EDGE_INGEST).
+    """
+    payload = []
+    for row in rows:
+        data = {"name": row["name"], "description": row["description"]}
+        for col in extra_cols:
+            key, column = (col, col) if isinstance(col, str) else col
+            data[column] = row[key]
+        payload.append(data)
+
+    print(f"Adding {len(rows)} {table} via Edge Function...")
+    response = supabase.functions.invoke(
+        "ingest_entities",
+        invoke_options={"body": {"table": table, "world_id": get_world_id(), "rows": payload}}
+    )
+    # The function reports {"inserted": n} on success; anything else
+    # (or a short count) means rows were dropped server-side
+    result = response if isinstance(response, dict) else json.loads(response)
+    if result.get("error") or result.get("inserted") != len(rows):
+        raise RuntimeError(f"ingest_entities failed for {table}: {result}")
+    print(f"[OK] Added {len(rows)} {table}\n")
@@ -3,18 +3,101 @@ RAG Experiment Configuration File
 Contains all experiment parameters and database connection configurations
 """
 
+import functools
 import os
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List
 
+import httpx
+from supabase import create_client, ClientOptions
+from openai import OpenAI
+
 # ==================== Database Configuration ====================
 SUPABASE_URL = ""
 SUPABASE_ANON_KEY = ""
 OPENAI_API_KEY = ""
 
+# Direct Postgres connection string (optional, enables COPY bulk loads)
+SUPABASE_DB_URL = ""
+
+# Route entity ingestion through the ingest_entities Edge Function so
+# embeddings are generated and stored server-side. Source lives in
+# supabase/functions/ingest_entities; deploy it with
+#   supabase functions deploy ingest_entities
+USE_EDGE_INGEST = False
+
 # Test world name
 TEST_WORLD_NAME = "RAG Test World"
 
+# ==================== Shared Clients ====================
+
+# One client per process. Each create_client()/OpenAI() call opens its own
+# connection pool, so scripts that constructed clients ad hoc paid a fresh
+# TCP+TLS handshake (~200ms to Supabase cloud) on every run of every query
+# path. A single long-lived httpx client with HTTP/2 and keepalive lets all
+# requests multiplex and reuse warm connections.
+#
+# Construction is lazy (cached factories plus module __getattr__, same
+# idea as get_world_id below): create_client rejects the placeholder
+# credentials, and modules that only need constants from here — like
+# utils/metrics.py analyzing saved results offline — must stay
+# importable without any credentials configured.
+
+
+@functools.lru_cache(maxsize=None)
+def get_http_client() -> httpx.Client:
+    return httpx.Client(
+        http2=True,
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=10)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_supabase():
+    return create_client(
+        SUPABASE_URL,
+        SUPABASE_ANON_KEY,
+        options=ClientOptions(postgrest_client_timeout=10, storage_client_timeout=10),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_openai_client() -> OpenAI:
+    return OpenAI(api_key=OPENAI_API_KEY, http_client=get_http_client())
+
+
+_LAZY_CLIENTS = {
+    'http_client': get_http_client,
+    'supabase': get_supabase,
+    'openai_client': get_openai_client,
+}
+
+
+def __getattr__(name):
+    """Build a shared client on first access, keeping old imports working"""
+    try:
+        return _LAZY_CLIENTS[name]()
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+# The test world's ID is a constant; cache it on disk so every script
+# skips the startup worlds lookup. Delete the file to force a refresh.
+WORLD_ID_CACHE = Path(__file__).parent / ".world_id"
+
+
+@functools.lru_cache(maxsize=None)
+def get_world_id() -> str:
+    """Resolve the test world ID, cached locally after the first lookup"""
+    if WORLD_ID_CACHE.exists():
+        return WORLD_ID_CACHE.read_text().strip()
+
+    response = get_supabase().table('worlds').select('id').eq('name', TEST_WORLD_NAME).single().execute()
+    world_id = response.data['id']
+    WORLD_ID_CACHE.write_text(world_id)
+    return world_id
+
 # ==================== Experiment Configuration ====================
 
 # Number of runs per configuration
@@ -93,12 +176,19 @@ DEFAULT_RAG_CONFIG = {
 # ==================== Cost Calculation ====================
 
 # OpenAI pricing (per 1K tokens) - using gpt-4.1 pricing
+# Canonical pricing source: utils/metrics.py imports from here (it used
+# to carry its own copy with stale gpt-4 prices)
 PRICING = {
     "gpt-4-input": 0.002,      # $0.002 / 1K input tokens (gpt-4.1)
     "gpt-4-output": 0.008,     # $0.008 / 1K output tokens (gpt-4.1)
     "embedding": 0.0001,      # $0.0001 / 1K tokens
 }
 
+# Per-token costs, predivided once at import for the hot cost paths
+COST_PER_TOKEN_IN = PRICING['gpt-4-input'] / 1000
+COST_PER_TOKEN_OUT = PRICING['gpt-4-output'] / 1000
+COST_PER_TOKEN_EMB = PRICING['embedding'] / 1000
+
 # ==================== Output Paths ====================
 
 RESULTS_DIR = "results"
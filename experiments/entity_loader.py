@@ -0,0 +1,13 @@
+"""
+Load entity seed data for the RAG Test World from JSON files
+"""
+
+import json
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent / "data"
+
+def load_entities(name):
+    """Load an entity list from data/<name>.json"""
+    path = DATA_DIR / f"{name}.json"
+    return json.loads(path.read_text(encoding="utf-8"))
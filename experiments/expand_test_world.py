@@ -1,17 +1,15 @@
 """
 Expand RAG Test World entity count
 Goal: items, NPCs, abilities, rules all reach at least 50
-"""
 
-import sys
-sys.path.append('..')
+Run from the repo root: python -m experiments.expand_test_world
+"""
 
-from config import SUPABASE_URL, SUPABASE_ANON_KEY, TEST_WORLD_NAME
-from supabase import create_client
 import json
 
-# Connect to Supabase
-supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+from .config import TEST_WORLD_NAME, supabase
+
+# Shared client comes from config so every script reuses one connection pool
 
 # Get test world ID
 print("Connecting to Supabase...")
@@ -28,24 +26,30 @@ print(f"[OK] Found test world: {test_world['name']}")
 print(f"World ID: {WORLD_ID}")
 print(f"Description: {test_world['description']}\n")
 
-# Check current entity counts
+# Check current entity counts (one RPC round-trip instead of one query per table)
 entity_types = ['items', 'abilities', 'npcs', 'rules']
-current_counts = {}
+
+try:
+    current_counts = supabase.rpc('get_world_entity_counts', {'wid': WORLD_ID}).execute().data
+except Exception:
+    # Fallback for projects without migration 023: the example queries
+    # below carry an exact count header, so no extra queries are needed
+    current_counts = {}
 
 for entity_type in entity_types:
+    # Two example names plus the exact count header — only the columns
+    # and rows we actually print, instead of every column of every row
     response = supabase.table(entity_type)\
-        .select('*')\
+        .select('name', count='exact')\
         .eq('world_id', WORLD_ID)\
+        .limit(2)\
         .execute()
-    current_counts[entity_type] = len(response.data)
-    print(f"{entity_type}: {len(response.data)} items")
-
-    # Print first 2 examples to understand format
-    if len(response.data) > 0:
-        print(f"  Example: {response.data[0]['name']}")
-        if len(response.data) > 1:
-            print(f"  Example: {response.data[1]['name']}")
+    current_counts.setdefault(entity_type, response.count)
+
+    print(f"{entity_type}: {current_counts[entity_type]} items")
+    for example in response.data:
+        print(f"  Example: {example['name']}")
     print()
 
-print("\nCurrent total entities:", sum(current_counts.values()))
+print("\nCurrent total entities:", sum(current_counts[t] for t in entity_types))
 print("Goal: At least 50 per category")
@@ -1,26 +1,23 @@
 """
 Inspect actual prompt differences between No RAG vs RAG
-"""
 
-import sys
-sys.path.append('..')
+Run from the repo root: python -m experiments.inspect_prompts
+"""
 
-from config import SUPABASE_URL, SUPABASE_ANON_KEY, OPENAI_API_KEY, TEST_WORLD_NAME
-from utils.rag_simulator import RAGSimulator
-from supabase import create_client
-from openai import OpenAI
+from .config import supabase, openai_client, get_world_id
+from .utils.rag_simulator import RAGSimulator
 
-# Initialize
-supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-world_response = supabase.table('worlds').select('id').eq('name', TEST_WORLD_NAME).single().execute()
-WORLD_ID = world_response.data['id']
+# Shared clients come from config so every script reuses one connection pool
+# Get world ID (cached on disk after the first lookup)
+WORLD_ID = get_world_id()
+# Query embeddings are cached inside the simulator, so warm re-runs
+# skip the embedding API call
 simulator = RAGSimulator(supabase, openai_client, WORLD_ID)
 
 test_message = "I want to attack the goblin with my sword"
 
-# Get world info
-world_info = world_response.data
+# Get world info (the scripts only ever used the id field)
+world_info = {'id': WORLD_ID}
 
 print("=" * 80)
 print("Inspecting No RAG vs RAG prompt differences")
@@ -1,12 +1,27 @@
 """
 Regenerate Threshold ablation experiment plots
 Change the first plot from "Retrieved Entities vs Threshold" to "Latency vs Threshold"
+
+Run from the repo root: python -m experiments.regenerate_threshold_plot
 """
 
+import argparse
 import json
 import numpy as np
+
+# Agg skips GUI backend probing/init — the figure only ever goes to a PNG
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+# 150 dpi is plenty for drafts and halves rasterization time;
+# --publish restores full 300 dpi output
+parser = argparse.ArgumentParser(description='Regenerate the threshold ablation plot')
+parser.add_argument('--publish', action='store_true',
+                    help='render at publication quality (300 dpi instead of 150)')
+args = parser.parse_args()
+dpi = 300 if args.publish else 150
+
 # Read threshold experiment results
 import os
 base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,29 +34,25 @@ threshold_results = {float(k): v for k, v in threshold_results.items()}
 
 threshold_values = [0.5, 0.65, 0.8]
 
-# Calculate statistics for each threshold
+# Cost estimate prices (per token): input $0.03/1K, output $0.06/1K
+cost_prices = np.array([0.03, 0.06]) / 1000
+
+# Calculate statistics for each threshold: stack each threshold's runs
+# into an (n, 3) array and reduce once per statistic
 latencies = []
 input_tokens_list = []
 costs = []
 
 for threshold in threshold_values:
-    results = threshold_results[threshold]
-
-    # Latency
-    latency_vals = [r['latency'] for r in results]
-    latencies.append(np.mean(latency_vals))
-
-    # Input Tokens
-    input_token_vals = [r['input_tokens'] for r in results]
-    input_tokens_list.append(np.mean(input_token_vals))
+    a = np.array([
+        [r['latency'], r['input_tokens'], r['output_tokens']]
+        for r in threshold_results[threshold]
+    ], dtype=np.float64)
+    means = a.mean(axis=0)
 
-    # Cost (estimate: input_tokens * 0.03/1000 + output_tokens * 0.06/1000)
-    cost_vals = []
-    for r in results:
-        input_cost = r['input_tokens'] * 0.03 / 1000
-        output_cost = r['output_tokens'] * 0.06 / 1000
-        cost_vals.append(input_cost + output_cost)
-    costs.append(np.mean(cost_vals))
+    latencies.append(means[0])
+    input_tokens_list.append(means[1])
+    costs.append(means[1:] @ cost_prices)
 
 # Create plots
 fig, axes = plt.subplots(1, 3, figsize=(18, 5))
@@ -69,8 +80,8 @@ axes[2].grid(alpha=0.3)
 
 plt.tight_layout()
 output_path = os.path.join(base_dir, 'results', 'plots', 'ablation_threshold.png')
-plt.savefig(output_path, dpi=300, bbox_inches='tight')
-print(f"[OK] Figure saved to {output_path}")
+fig.savefig(output_path, dpi=dpi, bbox_inches='tight', pil_kwargs={'optimize': True})
+print(f"[OK] Figure saved to {output_path} ({dpi} dpi)")
 
 # Print data verification
 print("\nData Verification:")
@@ -1,35 +1,39 @@
 """
 Test latency difference between No RAG vs RAG
+
+Run from the repo root: python -m experiments.test_latency
 """
 
-import sys
-sys.path.append('..')
+from concurrent.futures import ThreadPoolExecutor
 
-from config import SUPABASE_URL, SUPABASE_ANON_KEY, OPENAI_API_KEY, TEST_WORLD_NAME
-from utils.rag_simulator import RAGSimulator
-from supabase import create_client
-from openai import OpenAI
+from .config import supabase, openai_client, get_world_id
+from .utils.rag_simulator import RAGSimulator
 
-# Initialize clients
-supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# Shared clients come from config so every script reuses one connection pool
 
-# Get world ID
-world_response = supabase.table('worlds').select('id').eq('name', TEST_WORLD_NAME).single().execute()
-WORLD_ID = world_response.data['id']
+# Get world ID (cached on disk after the first lookup)
+WORLD_ID = get_world_id()
 
-# Check entity counts
+# Check entity counts (one RPC round-trip instead of one query per table)
 entity_types = ['items', 'abilities', 'npcs', 'rules']
+try:
+    counts = supabase.rpc('get_world_entity_counts', {'wid': WORLD_ID}).execute().data
+except Exception:
+    # Fallback for projects without migration 023
+    counts = {}
+    for entity_type in entity_types:
+        response = supabase.table(entity_type).select('id', count='exact').eq('world_id', WORLD_ID).execute()
+        counts[entity_type] = response.count
+
 print("Current entity counts:")
 total_entities = 0
 for entity_type in entity_types:
-    response = supabase.table(entity_type).select('id', count='exact').eq('world_id', WORLD_ID).execute()
-    count = response.count
+    count = counts[entity_type]
     total_entities += count
     print(f"  {entity_type}: {count}")
 print(f"  Total: {total_entities}\n")
 
-# Initialize simulator
+# Initialize simulator (query embeddings cached across runs)
 simulator = RAGSimulator(supabase, openai_client, WORLD_ID)
 
 # Test scenario
@@ -40,39 +44,39 @@ print("Testing latency difference...")
 print("=" * 60)
 print()
 
-# Test No RAG
-print("[1/3] Testing No RAG...")
-no_rag_result = simulator.run_experiment(
-    player_message=test_message,
-    mode='no_rag'
-)
+# The three baselines are independent and each spends seconds waiting on
+# an OpenAI completion, so run them concurrently: wall time drops from
+# the sum of the three latencies to the slowest one
+print("Running No RAG, Random and RAG concurrently...")
+with ThreadPoolExecutor(max_workers=3) as executor:
+    no_rag_future = executor.submit(
+        simulator.run_experiment, player_message=test_message, mode='no_rag')
+    random_future = executor.submit(
+        simulator.run_experiment, player_message=test_message, mode='random', top_k=5)
+    rag_future = executor.submit(
+        simulator.run_experiment, player_message=test_message, mode='rag',
+        top_k=5, similarity_threshold=0.65)
+
+    no_rag_result = no_rag_future.result()
+    random_result = random_future.result()
+    rag_result = rag_future.result()
+print()
+
+print("[1/3] No RAG:")
 print(f"  Input tokens: {no_rag_result['input_tokens']}")
 print(f"  Output tokens: {no_rag_result['output_tokens']}")
 print(f"  Total tokens: {no_rag_result['total_tokens']}")
 print(f"  Latency: {no_rag_result['latency']:.2f}s")
 print()
 
-# Test Random
-print("[2/3] Testing Random Sampling...")
-random_result = simulator.run_experiment(
-    player_message=test_message,
-    mode='random',
-    top_k=5
-)
+print("[2/3] Random Sampling:")
 print(f"  Input tokens: {random_result['input_tokens']}")
 print(f"  Output tokens: {random_result['output_tokens']}")
 print(f"  Total tokens: {random_result['total_tokens']}")
 print(f"  Latency: {random_result['latency']:.2f}s")
 print()
 
-# Test RAG
-print("[3/3] Testing RAG...")
-rag_result = simulator.run_experiment(
-    player_message=test_message,
-    mode='rag',
-    top_k=5,
-    similarity_threshold=0.65
-)
+print("[3/3] RAG:")
 print(f"  Input tokens: {rag_result['input_tokens']}")
 print(f"  Output tokens: {rag_result['output_tokens']}")
 print(f"  Total tokens: {rag_result['total_tokens']}")
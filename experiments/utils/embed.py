@@ -0,0 +1,37 @@
+"""
+Batched embedding helper for query-side flows
+
+The embeddings endpoint accepts a list of inputs and returns every
+vector in one round-trip, so M texts cost one request instead of M.
+Loops like [generate_query_embedding(t) for t in texts] should call
+embed_batch(texts) instead.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+from ..config import EMBEDDING_MODEL, openai_client
+
+# API limit on inputs per embeddings request
+MAX_INPUTS = 2048
+
+EMBEDDING_DIM = 1536  # text-embedding-ada-002
+
+
+def embed_batch(texts: Sequence[str], model: str = EMBEDDING_MODEL) -> np.ndarray:
+    """Embed texts in as few API round-trips as possible
+
+    Returns a (len(texts), 1536) float32 array, rows in input order.
+    """
+    vectors: List[np.ndarray] = []
+    for start in range(0, len(texts), MAX_INPUTS):
+        chunk = list(texts[start:start + MAX_INPUTS])
+        response = openai_client.embeddings.create(model=model, input=chunk)
+        vectors.extend(
+            np.asarray(item.embedding, dtype=np.float32)
+            for item in response.data
+        )
+    if not vectors:
+        return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    return np.vstack(vectors)
@@ -0,0 +1,120 @@
+"""
+Memmap-backed cache for query embeddings
+
+The experiment scripts embed the same handful of test messages on every
+run; a content-hashed cache returns them without an OpenAI round-trip.
+Vectors live as contiguous float32 rows in results/embeddings.f32 with a
+small sidecar dict mapping sha1(text) -> row index, so a warm lookup is
+a pointer into the memory map rather than a pickle deserialize and the
+OS shares the pages across processes.
+"""
+
+import atexit
+import hashlib
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+DIM = 1536  # text-embedding-ada-002
+_ROW_BYTES = DIM * 4
+
+DATA_PATH = Path(__file__).parent.parent / "results" / "embeddings.f32"
+INDEX_PATH = Path(__file__).parent.parent / "results" / "embedding_index.pkl"
+
+_index = {}
+_dirty = False
+_arr = None  # lazily (re)mapped view over DATA_PATH
+
+
+def _rows():
+    return DATA_PATH.stat().st_size // _ROW_BYTES if DATA_PATH.exists() else 0
+
+
+def _load():
+    global _index
+    if INDEX_PATH.exists():
+        try:
+            with open(INDEX_PATH, 'rb') as f:
+                _index = pickle.load(f)
+        except Exception:
+            # A corrupt index just means cold misses
+            _index = {}
+    # If the data file is missing or truncated, the index is stale
+    rows = _rows()
+    if any(row >= rows for row in _index.values()):
+        _index = {}
+
+
+def _save():
+    if not _dirty:
+        return
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(INDEX_PATH, 'wb') as f:
+        pickle.dump(_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+_load()
+atexit.register(_save)
+
+
+def _view():
+    """Memory-map the data file, remapping after appends"""
+    global _arr
+    rows = _rows()
+    if _arr is None or _arr.shape[0] != rows:
+        _arr = np.memmap(DATA_PATH, dtype=np.float32, mode='r', shape=(rows, DIM))
+    return _arr
+
+
+# Default model for cache keys; entries embed their model so switching
+# embedding models can never serve stale vectors
+DEFAULT_MODEL = "text-embedding-ada-002"
+
+
+def _key(text, model=DEFAULT_MODEL):
+    return hashlib.blake2b(
+        f"{model}\0{text.strip().lower()}".encode(), digest_size=20
+    ).hexdigest()
+
+
+def store(text, embedding, model=DEFAULT_MODEL):
+    """Append a precomputed embedding to the cache (see utils/preembed.py)
+
+    Vectors are unit-normalized before writing, so any similarity against
+    a cached vector is a plain dot product — no per-query norms, and
+    batched scoring collapses to one BLAS matrix-vector product. Cosine
+    similarity is scale-invariant, so pgvector retrieval is unaffected.
+    """
+    global _dirty
+    key = _key(text, model)
+    if key in _index:
+        return
+    vec = np.asarray(embedding, dtype=np.float64).reshape(-1)
+    vec = (vec / (np.linalg.norm(vec) + 1e-12)).astype(np.float32)
+    DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
+    row = _rows()
+    with open(DATA_PATH, 'ab') as f:
+        f.write(vec.tobytes())
+    _index[key] = row
+    _dirty = True
+
+
+def lookup(text, model=DEFAULT_MODEL):
+    """Return the cached embedding for text, or None on a miss"""
+    row = _index.get(_key(text, model))
+    return None if row is None else _view()[row]
+
+
+def cached_embedding(text, compute, model=DEFAULT_MODEL):
+    """Return the embedding for text, computing (and persisting) on a miss
+
+    compute is the fallback that performs the actual API call.
+    Returns a float32 row view into the memory map.
+    """
+    key = _key(text, model)
+    row = _index.get(key)
+    if row is None:
+        store(text, compute(text), model)
+        row = _index[key]
+    return _view()[row]
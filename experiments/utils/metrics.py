@@ -4,23 +4,23 @@ Metrics calculation and statistical analysis tools
 
 import numpy as np
 from scipy import stats
+from dataclasses import dataclass
 from typing import List, Dict, Tuple
 
+# Pricing lives in config.py so cost numbers can't drift between modules
+# (this file used to carry its own copy with stale gpt-4 prices)
+from ..config import PRICING, COST_PER_TOKEN_IN, COST_PER_TOKEN_OUT, COST_PER_TOKEN_EMB
 
-# OpenAI pricing (per 1K tokens)
-PRICING = {
-    "gpt-4-input": 0.03,      # $0.03 / 1K input tokens
-    "gpt-4-output": 0.06,     # $0.06 / 1K output tokens
-    "embedding": 0.0001,      # $0.0001 / 1K tokens
-}
+
+# Per-token input/output prices, for vectorized cost over token arrays
+_PRICE_VECTOR = np.array([COST_PER_TOKEN_IN, COST_PER_TOKEN_OUT])
 
 
 def calculate_cost(input_tokens: int, output_tokens: int, embedding_tokens: int = 0) -> float:
     """Calculate cost for a single request"""
-    input_cost = (input_tokens / 1000) * PRICING['gpt-4-input']
-    output_cost = (output_tokens / 1000) * PRICING['gpt-4-output']
-    embedding_cost = (embedding_tokens / 1000) * PRICING['embedding']
-    return input_cost + output_cost + embedding_cost
+    return (input_tokens * COST_PER_TOKEN_IN
+            + output_tokens * COST_PER_TOKEN_OUT
+            + embedding_tokens * COST_PER_TOKEN_EMB)
 
 
 def calculate_context_efficiency(rag_tokens: int, full_tokens: int) -> float:
@@ -31,62 +31,87 @@ def calculate_context_efficiency(rag_tokens: int, full_tokens: int) -> float:
     return reduction * 100
 
 
-def aggregate_metrics(results: List[Dict]) -> Dict:
+@dataclass
+class MetricStats:
+    """Aggregated statistics for one group of runs
+
+    The statistics stay in four contiguous float64 vectors (one entry
+    per metric in `names`) instead of ~25 nested dict entries. Access is
+    attribute-based — stats.mean[i] — but dict-style indexing like
+    stats['latency']['mean'] is kept for existing consumers such as the
+    notebook cells.
+    """
+    names: tuple
+    mean: np.ndarray
+    std: np.ndarray
+    mn: np.ndarray
+    mx: np.ndarray
+    count: int
+    total_cost: float
+
+    def __getitem__(self, key):
+        if key == 'count':
+            return self.count
+        i = self.names.index(key)
+        values = {
+            'mean': self.mean[i],
+            'std': self.std[i],
+            'min': self.mn[i],
+            'max': self.mx[i],
+        }
+        if key == 'cost':
+            values['total'] = self.total_cost
+        return values
+
+
+def aggregate_metrics(results: List[Dict]) -> MetricStats:
     """Aggregate metrics from multiple experiment runs"""
     if not results:
         return {}
 
-    input_tokens = [r['input_tokens'] for r in results]
-    output_tokens = [r['output_tokens'] for r in results]
-    total_tokens = [r['total_tokens'] for r in results]
-    latencies = [r['latency'] for r in results]
-    context_sizes = [r.get('context_size_tokens', 0) for r in results]
-
-    costs = [
-        calculate_cost(r['input_tokens'], r['output_tokens'])
+    # Stack everything into one (N, 6) array so each statistic is a single
+    # axis-0 reduction instead of ~20 scalar NumPy calls over Python lists
+    arr = np.empty((len(results), 6), dtype=np.float64)
+    arr[:, :5] = [
+        [
+            r['input_tokens'],
+            r['output_tokens'],
+            r['total_tokens'],
+            r['latency'],
+            r.get('context_size_tokens', 0),
+        ]
         for r in results
     ]
-
-    return {
-        'count': len(results),
-        'input_tokens': {
-            'mean': np.mean(input_tokens),
-            'std': np.std(input_tokens),
-            'min': np.min(input_tokens),
-            'max': np.max(input_tokens),
-        },
-        'output_tokens': {
-            'mean': np.mean(output_tokens),
-            'std': np.std(output_tokens),
-            'min': np.min(output_tokens),
-            'max': np.max(output_tokens),
-        },
-        'total_tokens': {
-            'mean': np.mean(total_tokens),
-            'std': np.std(total_tokens),
-            'min': np.min(total_tokens),
-            'max': np.max(total_tokens),
-        },
-        'latency': {
-            'mean': np.mean(latencies),
-            'std': np.std(latencies),
-            'min': np.min(latencies),
-            'max': np.max(latencies),
-        },
-        'context_size': {
-            'mean': np.mean(context_sizes),
-            'std': np.std(context_sizes),
-            'min': np.min(context_sizes),
-            'max': np.max(context_sizes),
-        },
-        'cost': {
-            'mean': np.mean(costs),
-            'std': np.std(costs),
-            'min': np.min(costs),
-            'max': np.max(costs),
-            'total': np.sum(costs),
-        }
-    }
+    # Cost as one matrix-vector product over the token columns rather than
+    # a calculate_cost() call per row (kept for the single-request path)
+    arr[:, 5] = arr[:, :2] @ _PRICE_VECTOR
+
+    return MetricStats(
+        names=('input_tokens', 'output_tokens', 'total_tokens',
+               'latency', 'context_size', 'cost'),
+        mean=arr.mean(axis=0),
+        std=arr.std(axis=0),
+        mn=arr.min(axis=0),
+        mx=arr.max(axis=0),
+        count=len(results),
+        total_cost=arr[:, 5].sum(),
+    )
+
+
+def _ttest(a: np.ndarray, b: np.ndarray) -> Tuple[float, float]:
+    """Closed-form independent two-sample t-test (equal variances)
+
+    A few NumPy ops plus one stats.t.sf call, instead of the argument
+    validation and list conversion stats.ttest_ind repeats per call.
+    """
+    na, nb = len(a), len(b)
+    va, vb = a.var(ddof=1), b.var(ddof=1)
+    df = na + nb - 2
+    pooled_var = ((na - 1) * va + (nb - 1) * vb) / df
+    se = np.sqrt(pooled_var * (1 / na + 1 / nb))
+    t_stat = (a.mean() - b.mean()) / se
+    p_value = 2 * stats.t.sf(abs(t_stat), df)
+    return t_stat, p_value
 
 
 def perform_t_test(
@@ -104,11 +129,10 @@ def perform_t_test(
     Returns:
         (t_statistic, p_value)
     """
-    group1_values = [r[metric_key] for r in group1_results]
-    group2_values = [r[metric_key] for r in group2_results]
+    group1_values = np.asarray([r[metric_key] for r in group1_results], dtype=np.float64)
+    group2_values = np.asarray([r[metric_key] for r in group2_results], dtype=np.float64)
 
-    t_stat, p_value = stats.ttest_ind(group1_values, group2_values)
-    return t_stat, p_value
+    return _ttest(group1_values, group2_values)
 
 
 def calculate_confidence_interval(values: List[float], confidence: float = 0.95) -> Tuple[float, float]:
@@ -141,52 +165,51 @@ def compare_baselines(
         'rag': aggregate_metrics(rag_results),
     }
 
-    # Calculate significance
+    # Calculate significance. Convert each group to an array once and
+    # hand column views to the t-test instead of rebuilding lists per test
     comparison['significance_tests'] = {}
 
-    # RAG vs No RAG
-    for metric in ['total_tokens', 'latency']:
-        t_stat, p_value = perform_t_test(rag_results, no_rag_results, metric)
-        comparison['significance_tests'][f'rag_vs_no_rag_{metric}'] = {
-            't_statistic': t_stat,
-            'p_value': p_value,
-            'significant': p_value < 0.05
-        }
-
-    # RAG vs Random
-    for metric in ['total_tokens', 'latency']:
-        t_stat, p_value = perform_t_test(rag_results, random_results, metric)
-        comparison['significance_tests'][f'rag_vs_random_{metric}'] = {
-            't_statistic': t_stat,
-            'p_value': p_value,
-            'significant': p_value < 0.05
-        }
+    test_metrics = ('total_tokens', 'latency')
+    arrays = {
+        name: np.asarray([[r[m] for m in test_metrics] for r in group], dtype=np.float64)
+        for name, group in (
+            ('no_rag', no_rag_results),
+            ('random', random_results),
+            ('rag', rag_results),
+        )
+    }
 
-    # Calculate context efficiency
+    for baseline in ('no_rag', 'random'):
+        for col, metric in enumerate(test_metrics):
+            t_stat, p_value = _ttest(arrays['rag'][:, col], arrays[baseline][:, col])
+            comparison['significance_tests'][f'rag_vs_{baseline}_{metric}'] = {
+                't_statistic': t_stat,
+                'p_value': p_value,
+                'significant': p_value < 0.05
+            }
+
+    # Calculate context efficiency from the means aggregate_metrics
+    # already computed, instead of re-scanning the result lists
     if no_rag_results and rag_results:
-        avg_no_rag_tokens = np.mean([r['input_tokens'] for r in no_rag_results])
-        avg_rag_tokens = np.mean([r['input_tokens'] for r in rag_results])
         comparison['context_efficiency_percentage'] = calculate_context_efficiency(
-            avg_rag_tokens,
-            avg_no_rag_tokens
+            comparison['rag']['input_tokens']['mean'],
+            comparison['no_rag']['input_tokens']['mean']
         )
 
     return comparison
 
 
-def format_metrics_table(metrics: Dict) -> str:
+def format_metrics_table(metrics: MetricStats) -> str:
     """Format metrics as Markdown table"""
     lines = []
     lines.append("| Metric | Mean | Std | Min | Max |")
     lines.append("|--------|------|-----|-----|-----|")
 
-    for metric_name, metric_values in metrics.items():
-        if isinstance(metric_values, dict) and 'mean' in metric_values:
-            lines.append(
-                f"| {metric_name} | {metric_values['mean']:.2f} | "
-                f"{metric_values['std']:.2f} | {metric_values['min']:.2f} | "
-                f"{metric_values['max']:.2f} |"
-            )
+    for name, mean, std, mn, mx in zip(
+            metrics.names, metrics.mean, metrics.std, metrics.mn, metrics.mx):
+        lines.append(
+            f"| {name} | {mean:.2f} | {std:.2f} | {mn:.2f} | {mx:.2f} |"
+        )
 
     return "\n".join(lines)
 
@@ -0,0 +1,30 @@
+"""
+Pre-embed the test message set into the shared embedding cache
+
+The inspect/latency scripts embed the same hardcoded test messages on
+every run. Embedding them ahead of time — one batched API call for the
+whole list, not one per message — makes every replay hit the cache, so
+the embedding step costs nothing and skips a network round-trip.
+
+Run from the repo root: python -m experiments.utils.preembed
+"""
+
+from .embed import embed_batch
+from .embedding_cache import store
+
+# The test scenarios used across the experiment scripts
+TEST_MESSAGES = [
+    "I want to attack the goblin with my sword",
+]
+
+
+def preembed(messages=TEST_MESSAGES):
+    """Embed all messages in one batched call and seed the cache"""
+    for message, vector in zip(messages, embed_batch(messages)):
+        store(message, vector)
+    return len(messages)
+
+
+if __name__ == '__main__':
+    count = preembed()
+    print(f"[OK] Pre-embedded {count} test message(s) into the cache")
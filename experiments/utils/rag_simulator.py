@@ -3,11 +3,168 @@ RAG Simulator - Simulates the RAG process of the real system
 Does not depend on actual API, directly calls database and OpenAI
 """
 
+import asyncio
+import json
+import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, RateLimitError
 from supabase import Client as SupabaseClient
 import random
+import httpx
+import numpy as np
+import tiktoken
+
+from ..config import OPENAI_API_KEY
+from .embedding_cache import cached_embedding, lookup, store
+from .semantic_cache import LSHCache
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# Shared BPE encoder for token counts. tiktoken's Rust tokenizer counts a
+# long context faster than str.split builds its throwaway list, and the
+# counts are exact instead of ~25% low.
+_ENC = tiktoken.encoding_for_model("gpt-4")
+
+# On-disk snapshot of the full-world entity set for No-RAG mode. The
+# snapshot is keyed on (world_id, per-table entity counts) and refreshed
+# whenever the counts change, so repeat runs skip the seven per-table
+# fetches entirely.
+SNAPSHOT_PATH = Path(__file__).resolve().parent.parent / "results" / "all_entities.pkl"
+
+# Constants shared by the retrieval/generation paths so long sweeps
+# don't rebuild the same strings and dicts thousands of times
+_ENTITY_TYPES = ('items', 'abilities', 'locations', 'npcs',
+                 'organizations', 'taxonomies', 'rules')
+
+_SYSTEM_PROMPT = """You are an experienced and objective game master for a tabletop role-playing game.
+
+DM Guidelines:
+- Acknowledge player actions with logical consequences
+- Provide immersive, vivid descriptions
+- Avoid describing player emotions (only environmental effects)
+- Use objective narration without meta-commentary
+- Refer to unknown entities descriptively, not by name
+- Proactively advance the story to decision points"""
+
+
+# Only the columns the context assembler reads. SELECT * would drag the
+# 1536-dim embedding column over the wire for every row.
+_ENTITY_COLUMNS = dict.fromkeys(_ENTITY_TYPES, 'id, name, description')
+_ENTITY_COLUMNS['rules'] = 'id, name, description, priority'
+
+
+def _entity_limits(top_k: int) -> Dict[str, int]:
+    """Per-entity-type match counts for a given top_k"""
+    return {
+        'items': top_k,
+        'abilities': top_k,
+        'locations': top_k,
+        'npcs': top_k,
+        'organizations': min(top_k, 3),
+        'taxonomies': min(top_k, 3),
+        'rules': max(top_k, 10)
+    }
+
+
+# Context section order and headings (rules are special-cased for the
+# priority prefix)
+_NAMED_SECTIONS = (
+    ('items', 'ITEMS'),
+    ('abilities', 'ABILITIES'),
+    ('locations', 'LOCATIONS'),
+    ('npcs', 'NPCs'),
+)
+
+
+def _fmt_named(entity_list: List[Dict]) -> str:
+    """Join the per-entity context lines precomputed at fetch time"""
+    return "\n".join(entity['_display'] for entity in entity_list)
+
+
+def _dedupe_by_id(results: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Drop rows whose id already appeared in an earlier entity list
+
+    The match_* functions run independently, so nothing stops one row
+    surfacing through several of them; a duplicate line in the context
+    pays its input tokens twice for no information. First occurrence
+    wins, in the dict's section order.
+    """
+    seen = set()
+    dropped = 0
+    for entity_type, rows in results.items():
+        kept = []
+        for row in rows:
+            row_id = row.get('id')
+            if row_id is not None and row_id in seen:
+                dropped += 1
+                continue
+            if row_id is not None:
+                seen.add(row_id)
+            kept.append(row)
+        results[entity_type] = kept
+    if dropped:
+        print(f"Info: dropped {dropped} duplicate entities before assembly")
+    return results
+
+
+def _attach_display(results: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Precompute each row's context line once, at fetch time
+
+    The same entities recur across experiments in a sweep, so formatting
+    '- name: description' (with the [HIGH PRIORITY] prefix for priority
+    rules) on every assemble_context call repeated the same f-string
+    work; a row formats once for the lifetime of its dict. Idempotent,
+    so re-attaching to snapshot- or cache-loaded rows is a no-op.
+    """
+    for entity_type, rows in results.items():
+        if entity_type == 'rules':
+            for row in rows:
+                if '_display' not in row:
+                    prefix = "[HIGH PRIORITY] " if row.get('priority') else ""
+                    row['_display'] = f"- {prefix}{row['name']}: {row.get('description', '')}"
+        else:
+            for row in rows:
+                if '_display' not in row:
+                    row['_display'] = f"- {row['name']}: {row.get('description', '')}"
+    return results
+
+
+def _canonical_order(entity_list: List[Dict]) -> List[Dict]:
+    """Deterministic entity ordering: most-similar first, name as tiebreak
+
+    The same entity set must always assemble to a byte-identical context,
+    whatever order the database happened to return rows in — OpenAI's
+    prompt caching only fires when the prompt prefix matches byte for
+    byte across calls.
+    """
+    if entity_list and 'similarity' in entity_list[0]:
+        return sorted(entity_list, key=lambda e: (-e['similarity'], e.get('name', '')))
+    return sorted(entity_list, key=lambda e: e.get('name', ''))
+
+
+def _load_entity_snapshot(world_id: str, version_tag: tuple) -> Optional[Dict[str, List[Dict]]]:
+    """Return the pickled entity snapshot if it matches the version tag"""
+    if not SNAPSHOT_PATH.exists():
+        return None
+    try:
+        with open(SNAPSHOT_PATH, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        return None
+    if snapshot.get('world_id') == world_id and snapshot.get('version_tag') == version_tag:
+        return snapshot['entities']
+    return None
+
+
+def _save_entity_snapshot(world_id: str, version_tag: tuple, entities: Dict[str, List[Dict]]) -> None:
+    """Persist the entity snapshot alongside its version tag"""
+    SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = {'world_id': world_id, 'version_tag': version_tag, 'entities': entities}
+    with open(SNAPSHOT_PATH, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 class RAGSimulator:
@@ -17,40 +174,135 @@ class RAGSimulator:
         self,
         supabase: SupabaseClient,
         openai_client: OpenAI,
-        world_id: str
+        world_id: str,
+        async_openai_client: Optional[AsyncOpenAI] = None
     ):
         self.supabase = supabase
         self.openai = openai_client
         self.world_id = world_id
+        self._async_openai = async_openai_client
+        # Semantic cache: near-duplicate queries reuse retrieval results
+        # instead of repeating the per-table pgvector RPCs
+        self.semantic_cache = LSHCache()
+        # Assembled-context cache keyed on the exact entity set, so the
+        # big No-RAG context string is built once per entity snapshot
+        self._context_cache: Dict[tuple, str] = {}
+        # World row and its WORLD SETTING prefix are static per world;
+        # fetched/built once and reused across runs (see refresh_world)
+        self._world_info: Optional[Dict] = None
+        self._world_prefix: Optional[str] = None
+        self._world_prefix_tokens: Optional[int] = None
+        # In-memory flat vector index, built lazily the first time a
+        # match_* RPC fails (see _match_local)
+        self._vector_index: Optional[Dict[str, tuple]] = None
+
+    @property
+    def world_info(self) -> Dict:
+        """World row, fetched once and reused across experiments"""
+        if self._world_info is None:
+            self._world_info = self.supabase.table('worlds')\
+                .select('*')\
+                .eq('id', self.world_id)\
+                .single()\
+                .execute()\
+                .data
+        return self._world_info
+
+    def refresh_world(self) -> None:
+        """Drop the cached world row and everything derived from it"""
+        self._world_info = None
+        self._world_prefix = None
+        self._world_prefix_tokens = None
+        self._context_cache.clear()
+
+    @property
+    def async_openai(self) -> AsyncOpenAI:
+        """Async OpenAI client, created on first use
+
+        Pooled HTTP/2 transport mirroring config.http_client (which the
+        injected sync clients already share), so concurrent batch
+        completions multiplex warm connections instead of paying a
+        TCP+TLS handshake each.
+        """
+        if self._async_openai is None:
+            self._async_openai = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                http_client=httpx.AsyncClient(
+                    http2=True,
+                    timeout=60.0,
+                    limits=httpx.Limits(max_connections=32, keepalive_expiry=60)
+                )
+            )
+        return self._async_openai
 
     def generate_query_embedding(self, text: str) -> List[float]:
-        """Generate embedding vector for query"""
+        """Generate embedding vector for query
+
+        Backed by the persistent content-addressed cache: repeated (and
+        normalized-identical) messages return the stored float32 vector
+        without an OpenAI round-trip.
+        """
+        return cached_embedding(text, self._openai_embed, model=EMBEDDING_MODEL)
+
+    def _openai_embed(self, text: str) -> List[float]:
+        """Uncached embedding call (cache-miss path)"""
         response = self.openai.embeddings.create(
-            model="text-embedding-ada-002",
+            model=EMBEDDING_MODEL,
             input=text
         )
         return response.data[0].embedding
 
+    def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed many queries in one API round-trip
+
+        Duplicates and cache hits are served locally; only the texts
+        actually missing from the cache go to the API, as a single
+        batched request. Returns vectors in input order.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        missing = [t for t in unique_texts if lookup(t, EMBEDDING_MODEL) is None]
+        if missing:
+            response = self.openai.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=missing
+            )
+            # The response may arrive out of order; item.index maps each
+            # vector back to its input text
+            for item in response.data:
+                store(missing[item.index], item.embedding, EMBEDDING_MODEL)
+        return [lookup(t, EMBEDDING_MODEL) for t in texts]
+
     def retrieve_with_rag(
         self,
         query_embedding: List[float],
         top_k: int = 5,
         similarity_threshold: float = 0.65
     ) -> Dict[str, List[Dict]]:
-        """Retrieve relevant entities using RAG"""
-
-        results = {}
-        entity_types = {
-            'items': top_k,
-            'abilities': top_k,
-            'locations': top_k,
-            'npcs': top_k,
-            'organizations': min(top_k, 3),
-            'taxonomies': min(top_k, 3),
-            'rules': max(top_k, 10)
-        }
-
-        for entity_type, limit in entity_types.items():
+        """Retrieve relevant entities using RAG
+
+        Primary path is the server-side match_* RPCs (migration 022);
+        entity types whose RPC fails fall back to a client-side cosine
+        search over an in-memory embedding index (see _match_local).
+        """
+
+        # Semantic cache pre-check: a query whose embedding is nearly
+        # identical to a previous one (cosine > 0.95) gets the cached
+        # entity lists without touching Supabase
+        cache_params = (top_k, similarity_threshold)
+        cached = self.semantic_cache.get(query_embedding, cache_params)
+        if cached is not None:
+            return cached
+
+        # Cached embeddings arrive as float32 arrays; the RPC payload
+        # must be plain JSON
+        if hasattr(query_embedding, 'tolist'):
+            query_embedding = query_embedding.tolist()
+
+        entity_types = _entity_limits(top_k)
+
+        def _match_one(entity_type: str, limit: int):
+            # try/except stays inside the helper so one failing entity
+            # type doesn't abort the others
             try:
                 # Call database's match_* function
                 function_name = f'match_{entity_type}'
@@ -64,41 +316,192 @@ class RAGSimulator:
                     }
                 ).execute()
 
-                results[entity_type] = response.data if response.data else []
+                return entity_type, response.data if response.data else []
             except Exception as e:
-                print(f"Warning: Failed to retrieve {entity_type}: {e}")
-                results[entity_type] = []
+                print(f"Warning: match_{entity_type} RPC failed, using local index: {e}")
+                return entity_type, None
+
+        # The seven RPCs are independent network calls; fan them out so
+        # retrieval latency is the slowest round-trip, not the sum
+        with ThreadPoolExecutor(max_workers=len(entity_types)) as executor:
+            results = dict(executor.map(_match_one, entity_types, entity_types.values()))
+
+        failed = [entity_type for entity_type, rows in results.items() if rows is None]
+        if failed:
+            local = self._match_local(query_embedding, top_k, similarity_threshold)
+            for entity_type in failed:
+                results[entity_type] = local[entity_type]
+
+        _attach_display(_dedupe_by_id(results))
+        self.semantic_cache.put(query_embedding, results, cache_params)
+        return results
+
+    def _build_vector_index(self) -> Dict[str, tuple]:
+        """Fetch every entity embedding into per-type quantized matrices
 
+        A flat index in SoA layout: one contiguous (N, 1536) int8 matrix
+        per entity type, a per-row dequantization scale, and a parallel
+        metadata list. Rows are unit-normalized before quantization, so
+        a rescaled integer dot product against a normalized query
+        approximates cosine similarity. int8 storage is 4x smaller than
+        float32 (1.5 KB per row instead of 6 KB), and the search is
+        memory-bandwidth-bound, so the quantized scan moves 4x less
+        data per query at a negligible accuracy cost for this use.
+        """
+
+        def _fetch_one(entity_type: str):
+            try:
+                response = self.supabase.table(entity_type)\
+                    .select(_ENTITY_COLUMNS[entity_type] + ', embedding')\
+                    .eq('world_id', self.world_id)\
+                    .execute()
+                rows = response.data if response.data else []
+            except Exception as e:
+                print(f"Warning: Failed to index {entity_type}: {e}")
+                rows = []
+
+            metadata, vectors = [], []
+            for row in rows:
+                # PostgREST serializes pgvector columns as JSON strings
+                vec = row.pop('embedding', None)
+                if vec is None:
+                    continue
+                if isinstance(vec, str):
+                    vec = json.loads(vec)
+                vectors.append(vec)
+                metadata.append(row)
+            if not vectors:
+                return entity_type, (np.empty((0, 0), dtype=np.int8),
+                                     np.empty(0, dtype=np.float32), [])
+            matrix = np.asarray(vectors, dtype=np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            # Symmetric per-row quantization: map each row's max |value|
+            # to 127 and keep the scale for dequantizing scores
+            scales = (np.abs(matrix).max(axis=1) / 127.0 + 1e-12).astype(np.float32)
+            quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+            return entity_type, (quantized, scales, metadata)
+
+        with ThreadPoolExecutor(max_workers=len(_ENTITY_TYPES)) as executor:
+            return dict(executor.map(_fetch_one, _ENTITY_TYPES))
+
+    def _match_local(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        similarity_threshold: float
+    ) -> Dict[str, List[Dict]]:
+        """Client-side top-k cosine search over the in-memory index
+
+        Fallback when the match_* RPCs are unavailable. For worlds whose
+        embeddings fit in memory this is one matmul + argpartition per
+        type instead of a pgvector round-trip; the index costs one full
+        fetch the first time and is reused for the simulator's lifetime.
+        """
+        if self._vector_index is None:
+            self._vector_index = self._build_vector_index()
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-12)
+        # Quantize the query the same way as the index rows; the int32
+        # accumulator keeps the int8 x int8 products from overflowing
+        query_scale = np.abs(query).max() / 127.0 + 1e-12
+        query_q = np.round(query / query_scale).astype(np.int8)
+
+        limits = _entity_limits(top_k)
+        results: Dict[str, List[Dict]] = {}
+        for entity_type, (matrix, scales, metadata) in self._vector_index.items():
+            if matrix.size == 0:
+                results[entity_type] = []
+                continue
+            limit = limits[entity_type]
+            raw = np.einsum('ij,j->i', matrix, query_q, dtype=np.int32)
+            scores = raw.astype(np.float32) * (scales * np.float32(query_scale))
+            if limit < len(scores):
+                idx = np.argpartition(-scores, limit)[:limit]
+            else:
+                idx = np.arange(len(scores))
+            idx = idx[scores[idx] > similarity_threshold]
+            idx = idx[np.argsort(-scores[idx])]
+            results[entity_type] = [
+                {**metadata[i], 'similarity': float(scores[i])} for i in idx
+            ]
         return results
 
+    def _entity_version_tag(self) -> Optional[tuple]:
+        """Cheap version tag for the world's entity set (counts per table)
+
+        One RPC round-trip; returns None when migration 023 is missing,
+        in which case snapshot caching is skipped.
+        """
+        try:
+            counts = self.supabase.rpc(
+                'get_world_entity_counts', {'wid': self.world_id}
+            ).execute().data
+            return tuple(sorted(counts.items()))
+        except Exception:
+            return None
+
     def retrieve_all_entities(self) -> Dict[str, List[Dict]]:
-        """Full retrieval of all entities (No RAG baseline)"""
+        """Full retrieval of all entities (No RAG baseline)
 
-        results = {}
-        entity_types = ['items', 'abilities', 'locations', 'npcs',
-                       'organizations', 'taxonomies', 'rules']
+        The result is snapshotted to disk and reused while the world's
+        entity counts are unchanged, so warm runs cost one count RPC
+        instead of seven full-table fetches.
+        """
+
+        version_tag = self._entity_version_tag()
+        if version_tag is not None:
+            cached = _load_entity_snapshot(self.world_id, version_tag)
+            if cached is not None:
+                return _attach_display(cached)
 
-        for entity_type in entity_types:
+        def _fetch_one(entity_type: str):
             try:
                 response = self.supabase.table(entity_type)\
-                    .select('*')\
+                    .select(_ENTITY_COLUMNS[entity_type])\
                     .eq('world_id', self.world_id)\
                     .execute()
 
-                results[entity_type] = response.data if response.data else []
+                return entity_type, response.data if response.data else []
             except Exception as e:
                 print(f"Warning: Failed to retrieve {entity_type}: {e}")
-                results[entity_type] = []
+                return entity_type, []
+
+        # Same fan-out as retrieve_with_rag: seven independent fetches
+        # overlap instead of running back to back
+        with ThreadPoolExecutor(max_workers=len(_ENTITY_TYPES)) as executor:
+            results = dict(executor.map(_fetch_one, _ENTITY_TYPES))
 
+        _attach_display(results)
+        if version_tag is not None:
+            _save_entity_snapshot(self.world_id, version_tag, results)
         return results
 
     def retrieve_random_entities(self, k: int = 5) -> Dict[str, List[Dict]]:
-        """Random sampling of entities (Random Sampling baseline)"""
-
-        # First get all entities
-        all_entities = self.retrieve_all_entities()
+        """Random sampling of entities (Random Sampling baseline)
+
+        Samples server-side via the sample_* functions (migration 024),
+        so only k rows per table cross the wire instead of every row.
+        Falls back to the full fetch + client-side sample when the
+        functions are not deployed.
+        """
+
+        def _sample_one(entity_type: str):
+            # Take more rules, matching the client-side sampling sizes
+            sample_size = max(k, 10) if entity_type == 'rules' else k
+            response = self.supabase.rpc(
+                f'sample_{entity_type}',
+                {'world_id': self.world_id, 'sample_count': sample_size}
+            ).execute()
+            return entity_type, response.data if response.data else []
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(_ENTITY_TYPES)) as executor:
+                return _attach_display(dict(executor.map(_sample_one, _ENTITY_TYPES)))
+        except Exception:
+            # Fallback for projects without migration 024
+            all_entities = self.retrieve_all_entities()
 
-        # Random sampling
         results = {}
         for entity_type, entities in all_entities.items():
             if entity_type == 'rules':
@@ -115,57 +518,180 @@ class RAGSimulator:
         self,
         entities: Dict[str, List[Dict]],
         world_info: Dict,
-        player_info: Optional[Dict] = None
+        player_info: Optional[Dict] = None,
+        max_context_tokens: Optional[int] = None
     ) -> str:
-        """Assemble context string"""
-
-        context_parts = []
-
-        # World setting
-        context_parts.append(f"=== WORLD SETTING ===")
-        context_parts.append(f"Name: {world_info.get('name', 'Unknown')}")
-        context_parts.append(f"Tone: {world_info.get('tone', 'neutral')}")
-        context_parts.append(f"Setting: {world_info.get('setting', '')}")
-        context_parts.append(f"Description: {world_info.get('description', '')}")
-        context_parts.append("")
-
-        # Items
-        if entities.get('items'):
-            context_parts.append("=== ITEMS ===")
-            for item in entities['items']:
-                context_parts.append(f"- {item['name']}: {item.get('description', '')}")
-            context_parts.append("")
-
-        # Abilities
-        if entities.get('abilities'):
-            context_parts.append("=== ABILITIES ===")
-            for ability in entities['abilities']:
-                context_parts.append(f"- {ability['name']}: {ability.get('description', '')}")
-            context_parts.append("")
-
-        # Locations
-        if entities.get('locations'):
-            context_parts.append("=== LOCATIONS ===")
-            for location in entities['locations']:
-                context_parts.append(f"- {location['name']}: {location.get('description', '')}")
-            context_parts.append("")
-
-        # NPCs
-        if entities.get('npcs'):
-            context_parts.append("=== NPCs ===")
-            for npc in entities['npcs']:
-                context_parts.append(f"- {npc['name']}: {npc.get('description', '')}")
-            context_parts.append("")
-
-        # Rules
-        if entities.get('rules'):
-            context_parts.append("=== RULES ===")
-            for rule in entities['rules']:
-                priority = "[HIGH PRIORITY] " if rule.get('is_priority') else ""
-                context_parts.append(f"- {priority}{rule['name']}: {rule.get('description', '')}")
-            context_parts.append("")
-
-        return "\n".join(context_parts)
+        """Assemble context string
+
+        With max_context_tokens set, entities are admitted in priority
+        order (high-priority rules, then items, abilities, locations,
+        NPCs, remaining rules — each group most-similar first) and
+        assembly stops once the token budget is spent. The default is
+        unbudgeted so the No-RAG baseline still sees the full context.
+
+        The prompt is ordered for OpenAI's prompt caching: the static
+        system prompt and world section lead, entities follow in
+        canonical order, and the per-query player action comes last in
+        the user message — so the long shared prefix stays byte-stable
+        across a sweep and repeat calls hit the cached-input path.
+        """
+
+        # Same world + same per-type entity lists (in order) => same
+        # string; reuse it instead of re-joining thousands of entity
+        # lines (the No-RAG baseline assembles the identical ~10KB
+        # context on every run). The ids are kept in retrieval order
+        # rather than sorted: two queries can return the same id set
+        # with different similarity rankings, which assemble to
+        # differently ordered contexts and must not share an entry.
+        cache_key = (
+            world_info.get('id'),
+            max_context_tokens,
+            tuple(
+                (entity_type, tuple(
+                    entity['id'] for entity in entity_list if 'id' in entity
+                ))
+                for entity_type, entity_list in entities.items()
+            ),
+        )
+        cached = self._context_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        world_section = self._world_section(world_info)
+
+        if max_context_tokens is not None:
+            context = self._assemble_budgeted(entities, world_section, max_context_tokens)
+            self._context_cache[cache_key] = context
+            return context
+
+        # One string per section, one comprehension per entity list —
+        # far fewer interpreter ops than the old per-line list.append
+        sections = [world_section]
+
+        for entity_type, title in _NAMED_SECTIONS:
+            entity_list = entities.get(entity_type)
+            if entity_list:
+                sections.append(f"=== {title} ===\n{_fmt_named(_canonical_order(entity_list))}")
+
+        # Rules (the priority prefix is baked into the display line)
+        rules = entities.get('rules')
+        if rules:
+            sections.append(f"=== RULES ===\n{_fmt_named(_canonical_order(rules))}")
+
+        context = "\n\n".join(sections) + "\n"
+        self._context_cache[cache_key] = context
+        return context
+
+    def _world_section(self, world_info: Dict) -> str:
+        """Build the WORLD SETTING block, memoized for the cached world row
+
+        The block (and its token count, used by the budgeted assembler)
+        is identical for every call against the same world, so it is
+        formatted and tokenized once instead of per experiment.
+        """
+        if world_info is self._world_info and self._world_prefix is not None:
+            return self._world_prefix
+
+        section = (
+            "=== WORLD SETTING ===\n"
+            f"Name: {world_info.get('name', 'Unknown')}\n"
+            f"Tone: {world_info.get('tone', 'neutral')}\n"
+            f"Setting: {world_info.get('setting', '')}\n"
+            f"Description: {world_info.get('description', '')}"
+        )
+        if world_info is self._world_info:
+            self._world_prefix = section
+            self._world_prefix_tokens = len(_ENC.encode(section))
+        return section
+
+    def _assemble_budgeted(
+        self,
+        entities: Dict[str, List[Dict]],
+        world_section: str,
+        max_context_tokens: int
+    ) -> str:
+        """Admit entity lines by priority until the token budget is spent
+
+        Output keeps the canonical section layout; only which entities
+        make it in changes. Within the rules section high-priority rules
+        come first.
+        """
+        if world_section == self._world_prefix and self._world_prefix_tokens is not None:
+            prefix_tokens = self._world_prefix_tokens
+        else:
+            prefix_tokens = len(_ENC.encode(world_section))
+        budget = max_context_tokens - prefix_tokens
+
+        rules = _canonical_order(entities.get('rules') or [])
+        admission_order = [
+            ('rules', [r for r in rules if r.get('priority')]),
+            ('items', _canonical_order(entities.get('items') or [])),
+            ('abilities', _canonical_order(entities.get('abilities') or [])),
+            ('locations', _canonical_order(entities.get('locations') or [])),
+            ('npcs', _canonical_order(entities.get('npcs') or [])),
+            ('rules', [r for r in rules if not r.get('priority')]),
+        ]
+
+        included: Dict[str, List[str]] = {}
+        exhausted = False
+        for entity_type, group in admission_order:
+            for entity in group:
+                line = entity['_display']
+                # Line cost plus the section header the first time a
+                # section opens (the +2 covers the joining newlines)
+                cost = len(_ENC.encode(line)) + 1
+                if entity_type not in included:
+                    cost += len(_ENC.encode(f"=== {entity_type.upper()} ===")) + 2
+                if cost > budget:
+                    exhausted = True
+                    break
+                budget -= cost
+                included.setdefault(entity_type, []).append(line)
+            if exhausted:
+                break
+
+        sections = [world_section]
+        for entity_type, title in _NAMED_SECTIONS + (('rules', 'RULES'),):
+            lines = included.get(entity_type)
+            if lines:
+                sections.append(f"=== {title} ===\n" + "\n".join(lines))
+
+        return "\n\n".join(sections) + "\n"
+
+    def _build_messages(self, context: str, player_message: str) -> List[Dict[str, str]]:
+        """Build the chat messages shared by the sync and async paths"""
+
+        user_prompt = f"""{context}
+
+Player Action: "{player_message}"
+
+Generate an engaging DM response based on the world context and player action."""
+
+        return [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    @staticmethod
+    def _package_generation(body: bytes, latency: float) -> Dict[str, Any]:
+        """Shape a raw chat completion body into the result dict
+
+        The SDK's default path validates the whole response into a
+        Pydantic model; the experiments only ever read five fields, so
+        the generation calls go through with_raw_response and this
+        parses the JSON body directly, binding choice/usage once.
+        """
+        data = json.loads(body)
+        choice = data['choices'][0]
+        usage = data['usage']
+        return {
+            'response_text': choice['message']['content'],
+            'input_tokens': usage['prompt_tokens'],
+            'output_tokens': usage['completion_tokens'],
+            'total_tokens': usage['total_tokens'],
+            'latency': latency,
+            'model': 'gpt-4'
+        }
 
     def generate_dm_response(
         self,
@@ -176,62 +702,160 @@ class RAGSimulator:
     ) -> Dict[str, Any]:
         """Call GPT-4 to generate DM response"""
 
-        system_prompt = """You are an experienced and objective game master for a tabletop role-playing game.
+        start_time = time.perf_counter()
 
-DM Guidelines:
-- Acknowledge player actions with logical consequences
-- Provide immersive, vivid descriptions
-- Avoid describing player emotions (only environmental effects)
-- Use objective narration without meta-commentary
-- Refer to unknown entities descriptively, not by name
-- Proactively advance the story to decision points"""
+        response = self.openai.chat.completions.with_raw_response.create(
+            model="gpt-4.1",
+            messages=self._build_messages(context, player_message),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            user=f"world:{self.world_id}"
+        )
 
-        user_prompt = f"""{context}
+        latency = time.perf_counter() - start_time
+        return self._package_generation(response.content, latency)
 
-Player Action: "{player_message}"
+    def generate_dm_response_stream(
+        self,
+        context: str,
+        player_message: str,
+        temperature: float = 0.8,
+        max_tokens: int = 1000
+    ):
+        """Stream the DM response, yielding text chunks as they arrive
 
-Generate an engaging DM response based on the world context and player action."""
+        Consumers see the first token after ~one network round-trip
+        instead of waiting out the whole generation. The generator's
+        return value (StopIteration.value) is the same result dict as
+        generate_dm_response plus a time_to_first_token field; token
+        counts come from tiktoken because streamed responses carry no
+        usage block.
+        """
+        messages = self._build_messages(context, player_message)
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+        first_token_time = None
 
         response = self.openai.chat.completions.create(
             model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=messages,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            user=f"world:{self.world_id}",
+            stream=True
         )
 
-        latency = time.time() - start_time
+        parts = []
+        for chunk in response:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if first_token_time is None:
+                first_token_time = time.perf_counter()
+            parts.append(delta)
+            yield delta
+
+        latency = time.perf_counter() - start_time
+        response_text = "".join(parts)
+        input_tokens = sum(len(_ENC.encode(m['content'])) for m in messages)
+        output_tokens = len(_ENC.encode(response_text))
 
         return {
-            'response_text': response.choices[0].message.content,
-            'input_tokens': response.usage.prompt_tokens,
-            'output_tokens': response.usage.completion_tokens,
-            'total_tokens': response.usage.total_tokens,
+            'response_text': response_text,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens,
             'latency': latency,
+            'time_to_first_token': (first_token_time or time.perf_counter()) - start_time,
             'model': 'gpt-4'
         }
 
+    async def generate_dm_response_async(
+        self,
+        context: str,
+        player_message: str,
+        temperature: float = 0.8,
+        max_tokens: int = 1000
+    ) -> Dict[str, Any]:
+        """Async variant of generate_dm_response
+
+        Retries with exponential backoff + jitter on rate limits, since
+        concurrent batch runs are the path most likely to hit 429s.
+        """
+
+        # Bind the bound method once; the retry loop and the batch
+        # runner's many tasks then skip the four-step attribute walk
+        create = self.async_openai.chat.completions.with_raw_response.create
+        messages = self._build_messages(context, player_message)
+
+        delay = 1.0
+        for attempt in range(6):
+            start_time = time.perf_counter()
+            try:
+                response = await create(
+                    model="gpt-4.1",
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    user=f"world:{self.world_id}"
+                )
+            except RateLimitError:
+                if attempt == 5:
+                    raise
+                await asyncio.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, 16.0)
+                continue
+
+            latency = time.perf_counter() - start_time
+            return self._package_generation(response.content, latency)
+
     def run_experiment(
         self,
         player_message: str,
         mode: str = 'rag',  # 'rag', 'no_rag', 'random'
         top_k: int = 5,
         similarity_threshold: float = 0.65,
-        temperature: float = 0.8
+        temperature: float = 0.8,
+        max_context_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """Run one complete experiment"""
 
-        # 1. Get world info
-        world_response = self.supabase.table('worlds')\
-            .select('*')\
-            .eq('id', self.world_id)\
-            .single()\
-            .execute()
-        world_info = world_response.data
+        # 1-3. Retrieve entities and assemble the context, timed
+        # separately so retrieval and generation latency can be
+        # attributed independently
+        retrieval_start = time.perf_counter()
+        entities, context = self._prepare_experiment(
+            player_message, mode, top_k, similarity_threshold,
+            max_context_tokens=max_context_tokens
+        )
+        retrieval_latency = time.perf_counter() - retrieval_start
+
+        # 4. Generate response
+        generation_result = self.generate_dm_response(
+            context,
+            player_message,
+            temperature=temperature
+        )
+
+        return self._build_result(
+            player_message, mode, top_k, similarity_threshold,
+            temperature, entities, context, generation_result,
+            retrieval_latency
+        )
+
+    def _prepare_experiment(
+        self,
+        player_message: str,
+        mode: str,
+        top_k: int,
+        similarity_threshold: float,
+        max_context_tokens: Optional[int] = None
+    ):
+        """Blocking half of an experiment: retrieval + context assembly"""
+
+        # 1. Get world info (cached; one Supabase round-trip per world,
+        # not per run — call refresh_world() after editing the world row)
+        world_info = self.world_info
 
         # 2. Retrieve entities
         if mode == 'rag':
@@ -252,17 +876,27 @@ Generate an engaging DM response based on the world context and player action.""
             raise ValueError(f"Unknown mode: {mode}")
 
         # 3. Assemble context
-        context = self.assemble_context(entities, world_info)
-
-        # 4. Generate response
-        generation_result = self.generate_dm_response(
-            context,
-            player_message,
-            temperature=temperature
+        context = self.assemble_context(
+            entities, world_info, max_context_tokens=max_context_tokens
         )
+        return entities, context
+
+    def _build_result(
+        self,
+        player_message: str,
+        mode: str,
+        top_k: int,
+        similarity_threshold: float,
+        temperature: float,
+        entities: Dict[str, List[Dict]],
+        context: str,
+        generation_result: Dict[str, Any],
+        retrieval_latency: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Shape one experiment's outputs into the result record"""
 
-        # 5. Calculate context size
-        context_tokens = len(context.split())  # Rough estimate
+        # 5. Calculate context size (exact BPE count)
+        context_tokens = len(_ENC.encode(context))
 
         # 6. Count retrieved entities
         entity_counts = {
@@ -282,7 +916,82 @@ Generate an engaging DM response based on the world context and player action.""
             'output_tokens': generation_result['output_tokens'],
             'total_tokens': generation_result['total_tokens'],
             'latency': generation_result['latency'],
+            'retrieval_latency': retrieval_latency,
             'temperature': temperature,
             'top_k': top_k,
             'similarity_threshold': similarity_threshold
         }
+
+    def run_experiment_batch(
+        self,
+        player_messages: List[str],
+        mode: str = 'rag',
+        top_k: int = 5,
+        similarity_threshold: float = 0.65,
+        temperature: float = 0.8
+    ) -> List[Dict[str, Any]]:
+        """Run one experiment per message
+
+        For RAG mode, all query embeddings are computed up front in one
+        batched API call; the per-message runs then hit the warm cache,
+        so N messages cost one embedding round-trip instead of N.
+        """
+        if mode == 'rag':
+            self.generate_query_embeddings(player_messages)
+
+        return [
+            self.run_experiment(
+                player_message=message,
+                mode=mode,
+                top_k=top_k,
+                similarity_threshold=similarity_threshold,
+                temperature=temperature
+            )
+            for message in player_messages
+        ]
+
+    async def run_experiment_batch_async(
+        self,
+        player_messages: List[str],
+        mode: str = 'rag',
+        top_k: int = 5,
+        similarity_threshold: float = 0.65,
+        temperature: float = 0.8,
+        max_concurrent: int = 10
+    ) -> List[Any]:
+        """Run experiments concurrently, bounded by a semaphore
+
+        The chat completion dominates each experiment's latency, so
+        overlapping them drops wall time from sum(latencies) to roughly
+        max(latency) x ceil(N / max_concurrent). Failures come back as
+        exception objects in the result list rather than aborting the
+        whole batch.
+        """
+        if mode == 'rag':
+            self.generate_query_embeddings(player_messages)
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def _one(message: str):
+            async with semaphore:
+                # Retrieval uses the blocking Supabase client; run it in
+                # a worker thread so completions keep overlapping
+                retrieval_start = time.perf_counter()
+                entities, context = await asyncio.to_thread(
+                    self._prepare_experiment,
+                    message, mode, top_k, similarity_threshold
+                )
+                retrieval_latency = time.perf_counter() - retrieval_start
+                generation_result = await self.generate_dm_response_async(
+                    context, message, temperature=temperature
+                )
+                return self._build_result(
+                    message, mode, top_k, similarity_threshold,
+                    temperature, entities, context, generation_result,
+                    retrieval_latency
+                )
+
+        return await asyncio.gather(
+            *[_one(message) for message in player_messages],
+            return_exceptions=True
+        )
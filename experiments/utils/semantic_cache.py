@@ -0,0 +1,55 @@
+"""
+Semantic cache for RAG retrieval results
+
+Near-duplicate player messages ("attack the goblin with my sword" vs
+"hit the goblin using my sword") embed to nearly identical vectors and
+repeat the exact same top-k lookup against Supabase. Random-projection
+LSH buckets group similar query embeddings; a cosine check inside the
+bucket decides whether a cached entity list can be reused instead of
+paying another round of pgvector RPCs.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class LSHCache:
+    """Random-projection LSH cache over query embeddings
+
+    Embeddings hashing to the same bucket are candidates; an exact
+    cosine-similarity check above `similarity_threshold` confirms a hit.
+    """
+
+    def __init__(self, dim: int = 1536, n_bits: int = 16, similarity_threshold: float = 0.95):
+        # Fixed seed so bucket assignment is stable across runs
+        rng = np.random.default_rng(42)
+        self.planes = rng.standard_normal((n_bits, dim))
+        self.similarity_threshold = similarity_threshold
+        self.buckets: Dict[Tuple, List[Tuple[np.ndarray, Dict[str, List[Dict]]]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _hash(self, embedding: np.ndarray) -> Tuple:
+        return tuple((self.planes @ embedding > 0).tolist())
+
+    def _normalize(self, embedding) -> np.ndarray:
+        e = np.asarray(embedding, dtype=np.float64)
+        norm = np.linalg.norm(e)
+        return e / norm if norm else e
+
+    def get(self, query_embedding, params: Tuple = ()) -> Optional[Dict[str, List[Dict]]]:
+        """Return cached retrieval results for a similar-enough query, if any"""
+        e_q = self._normalize(query_embedding)
+        bucket = self.buckets.get(self._hash(e_q) + params, [])
+        for e_stored, entities in bucket:
+            if np.dot(e_q, e_stored) > self.similarity_threshold:
+                self.hits += 1
+                return entities
+        self.misses += 1
+        return None
+
+    def put(self, query_embedding, entities: Dict[str, List[Dict]], params: Tuple = ()) -> None:
+        """Store retrieval results under the query's bucket"""
+        e_q = self._normalize(query_embedding)
+        self.buckets.setdefault(self._hash(e_q) + params, []).append((e_q, entities))
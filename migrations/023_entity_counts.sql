@@ -0,0 +1,20 @@
+-- Entity Count Aggregation
+-- Returns per-type entity counts for a world in a single round-trip.
+-- The experiment scripts previously issued one count query per table,
+-- paying a full PostgREST round-trip for each.
+
+CREATE OR REPLACE FUNCTION get_world_entity_counts(wid UUID)
+RETURNS JSON
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT json_build_object(
+    'items',         (SELECT count(*) FROM items         WHERE world_id = wid),
+    'abilities',     (SELECT count(*) FROM abilities     WHERE world_id = wid),
+    'locations',     (SELECT count(*) FROM locations     WHERE world_id = wid),
+    'npcs',          (SELECT count(*) FROM npcs          WHERE world_id = wid),
+    'organizations', (SELECT count(*) FROM organizations WHERE world_id = wid),
+    'taxonomies',    (SELECT count(*) FROM taxonomies    WHERE world_id = wid),
+    'rules',         (SELECT count(*) FROM rules         WHERE world_id = wid)
+  );
+$$;
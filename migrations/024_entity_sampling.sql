@@ -0,0 +1,81 @@
+-- Random Entity Sampling Functions
+-- The random-sampling experiment baseline previously fetched every row of
+-- every entity table just to sample a handful client-side. These functions
+-- sample server-side, so only k rows cross the wire per table.
+
+CREATE OR REPLACE FUNCTION sample_items(world_id UUID, sample_count INT DEFAULT 5)
+RETURNS SETOF items
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT * FROM items
+  WHERE items.world_id = sample_items.world_id
+  ORDER BY random()
+  LIMIT sample_count;
+$$;
+
+CREATE OR REPLACE FUNCTION sample_abilities(world_id UUID, sample_count INT DEFAULT 5)
+RETURNS SETOF abilities
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT * FROM abilities
+  WHERE abilities.world_id = sample_abilities.world_id
+  ORDER BY random()
+  LIMIT sample_count;
+$$;
+
+CREATE OR REPLACE FUNCTION sample_locations(world_id UUID, sample_count INT DEFAULT 5)
+RETURNS SETOF locations
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT * FROM locations
+  WHERE locations.world_id = sample_locations.world_id
+  ORDER BY random()
+  LIMIT sample_count;
+$$;
+
+CREATE OR REPLACE FUNCTION sample_npcs(world_id UUID, sample_count INT DEFAULT 5)
+RETURNS SETOF npcs
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT * FROM npcs
+  WHERE npcs.world_id = sample_npcs.world_id
+  ORDER BY random()
+  LIMIT sample_count;
+$$;
+
+CREATE OR REPLACE FUNCTION sample_organizations(world_id UUID, sample_count INT DEFAULT 5)
+RETURNS SETOF organizations
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT * FROM organizations
+  WHERE organizations.world_id = sample_organizations.world_id
+  ORDER BY random()
+  LIMIT sample_count;
+$$;
+
+CREATE OR REPLACE FUNCTION sample_taxonomies(world_id UUID, sample_count INT DEFAULT 5)
+RETURNS SETOF taxonomies
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT * FROM taxonomies
+  WHERE taxonomies.world_id = sample_taxonomies.world_id
+  ORDER BY random()
+  LIMIT sample_count;
+$$;
+
+CREATE OR REPLACE FUNCTION sample_rules(world_id UUID, sample_count INT DEFAULT 5)
+RETURNS SETOF rules
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+  SELECT * FROM rules
+  WHERE rules.world_id = sample_rules.world_id
+  ORDER BY random()
+  LIMIT sample_count;
+$$;
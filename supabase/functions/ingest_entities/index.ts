@@ -0,0 +1,102 @@
+/**
+ * ingest_entities Edge Function
+ *
+ * Server-side entity ingestion for the experiment seed scripts (see
+ * experiments/common.py and USE_EDGE_INGEST in experiments/config.py).
+ * The client POSTs only the text rows; embeddings are generated here,
+ * from Supabase's own egress, and inserted together with the rows — so
+ * the 1536-float vectors (~20KB/row as JSON) never transit the client.
+ *
+ * Deploy with: supabase functions deploy ingest_entities
+ * Requires the OPENAI_API_KEY secret (SUPABASE_URL and
+ * SUPABASE_SERVICE_ROLE_KEY are injected by the platform).
+ */
+
+import { createClient } from 'npm:@supabase/supabase-js@2'
+
+const EMBEDDING_MODEL = 'text-embedding-ada-002'
+
+// Provider limit for one embeddings request
+const EMBED_BATCH_SIZE = 2048
+
+// Only the world-scoped entity tables may be ingested through here
+const ALLOWED_TABLES = new Set([
+  'items',
+  'abilities',
+  'locations',
+  'npcs',
+  'organizations',
+  'taxonomies',
+  'rules',
+])
+
+/**
+ * Embed texts in batched OpenAI requests, preserving input order.
+ */
+async function embedBatch(texts: string[]): Promise<number[][]> {
+  const embeddings: number[][] = []
+  for (let start = 0; start < texts.length; start += EMBED_BATCH_SIZE) {
+    const input = texts.slice(start, start + EMBED_BATCH_SIZE)
+    const response = await fetch('https://api.openai.com/v1/embeddings', {
+      method: 'POST',
+      headers: {
+        Authorization: `Bearer ${Deno.env.get('OPENAI_API_KEY')}`,
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ model: EMBEDDING_MODEL, input }),
+    })
+    if (!response.ok) {
+      throw new Error(
+        `OpenAI embeddings request failed: ${response.status} ${await response.text()}`
+      )
+    }
+    const data = await response.json()
+    // Items can arrive out of order; index maps each vector back to its input
+    for (const item of data.data) {
+      embeddings[start + item.index] = item.embedding
+    }
+  }
+  return embeddings
+}
+
+Deno.serve(async (req) => {
+  try {
+    const { table, world_id, rows } = await req.json()
+
+    if (!ALLOWED_TABLES.has(table)) {
+      return Response.json({ error: `unknown table: ${table}` }, { status: 400 })
+    }
+    if (!world_id || !Array.isArray(rows) || rows.length === 0) {
+      return Response.json(
+        { error: 'world_id and a non-empty rows array are required' },
+        { status: 400 }
+      )
+    }
+
+    const embeddings = await embedBatch(
+      rows.map((row: { name: string; description: string }) => `${row.name} ${row.description}`)
+    )
+
+    // Service-role client so the seed inserts bypass RLS, matching the
+    // direct-table path in experiments/common.py
+    const supabase = createClient(
+      Deno.env.get('SUPABASE_URL')!,
+      Deno.env.get('SUPABASE_SERVICE_ROLE_KEY')!
+    )
+
+    const payload = rows.map((row: Record<string, unknown>, i: number) => ({
+      world_id,
+      ...row,
+      embedding: embeddings[i],
+    }))
+
+    const { error } = await supabase.from(table).insert(payload)
+    if (error) {
+      return Response.json({ error: error.message }, { status: 500 })
+    }
+
+    return Response.json({ inserted: payload.length })
+  } catch (err) {
+    return Response.json({ error: String(err) }, { status: 500 })
+  }
+})